@@ -9,58 +9,185 @@ options.
 
 Key Features:
 - Flexible font selection with fallback system (Garamond, Times, DejaVu, Noto)
-- Optional photocopy effect to simulate photocopied pages
+- Optional photocopy effect to simulate photocopied pages (JPEG pages, or
+  lossless with --lossless)
 - Test mode for quick previews (first 10 pages only)
 - Chapter selection for partial compilation
+- Parallel chapter rendering across worker processes (--jobs)
 - Configurable cover page (with or without image)
 - Robust font loading with multiple fallback options
 
 Code Structure:
 - Font handling:
+  - FONT_FAMILIES: Font files for each family, in fallback order
   - find_font_path(): Locates font files in standard locations
-  - Font loading logic with cascading fallbacks
+  - _load_font_family(): Registers all styles of one family with the PDF
 - Main compilation flow:
   1. Parse command line arguments
-  2. Load and validate chapter files
+  2. Load and validate chapter files (read concurrently on a thread pool)
   3. Initialize PDFBook with font preferences
-  4. Generate cover and chapters
+  4. Generate cover and chapters (optionally in parallel worker processes)
   5. Apply optional photocopy effect
   6. Output final PDF
 - Error handling:
   - Font loading failures with graceful degradation
   - File I/O error management
-  - Temporary file cleanup
 """
 
 import argparse
-import glob
+import concurrent.futures
+import io
+import itertools
 import os
 import re
 import sys
 
+import fitz
+
 from pdf_book import PDFBook
 from photocopy_effect import apply_photocopy_effect
 
-def find_font_path(font_name, style=""):
-	"""Find the correct font path by checking common locations"""
-	garamond_paths = {
+# Heading line of a chapter file, e.g. "# Chapter 3: The Church-Turing Thesis Revisited"
+_TITLE_RE = re.compile(r'^[#\s]*(?:Chapter\s+\d+:\s*)?(.*?)[#\s]*$')
+
+# Font families in fallback order: option name -> (family, display name, style paths)
+FONT_FAMILIES = {
+	'garamond': ("EBGaramond", "EB Garamond", {
 		"": "/usr/share/fonts/truetype/ebgaramond/EBGaramond12-Regular.ttf",
 		"B": "/usr/share/fonts/truetype/ebgaramond/EBGaramond12-Bold.ttf",
 		"I": "/usr/share/fonts/truetype/ebgaramond/EBGaramond12-Italic.ttf"
-	}
+	}),
+	'times': ("TimesNewRoman", "Times New Roman", {
+		"": "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf",
+		"B": "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Bold.ttf",
+		"I": "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Italic.ttf"
+	}),
+	'dejavu': ("DejaVuSerif", "DejaVu Serif", {
+		"": "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf",
+		"B": "/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf",
+		"I": "/usr/share/fonts/truetype/dejavu/DejaVuSerif-Italic.ttf"
+	}),
+	'noto': ("NotoSerif", "Noto Serif", {
+		"": "/usr/share/fonts/truetype/noto/NotoSerif-Regular.ttf",
+		"B": "/usr/share/fonts/truetype/noto/NotoSerif-Bold.ttf",
+		"I": "/usr/share/fonts/truetype/noto/NotoSerif-Italic.ttf"
+	}),
+}
+
+def find_font_path(font_name, style=""):
+	"""Find the correct font path by checking common locations"""
+	for family_name, _, paths in FONT_FAMILIES.values():
+		if family_name == font_name:
+			return paths.get(style)
+	return None
 
-	if font_name == "EBGaramond":
-		return garamond_paths.get(style)
+def _load_font_family(pdf, family_name, paths):
+	"""Register every style of a font family, returning False if a file is missing"""
+	if not all(os.path.isfile(path) for path in paths.values()):
+		return False
+	for style, path in paths.items():
+		pdf.add_font(family_name, style, path)
+	pdf.check_latin_support(family_name)
+	return True
+
+def _is_chapter_file(entry):
+	"""Chapter files are named like '01_ Title.txt': digits, an underscore, then the title"""
+	if not entry.name.endswith(".txt") or not entry.is_file():
+		return False
+	prefix, underscore, _ = entry.name.partition("_")
+	return bool(underscore) and prefix.isdigit()
+
+def _load_chapter(filename):
+	"""Read a chapter file and return (title, content), or None if it cannot be read"""
+	try:
+		with open(filename, "r", encoding="utf-8") as file:
+			title_line = file.readline().strip()
+			match = _TITLE_RE.match(title_line)
+			title = match.group(1) if match else title_line
+			return title, file.read()
+	except FileNotFoundError:
+		print(f"Warning: Chapter file {filename} not found")
+	except Exception as e:
+		print(f"Error processing chapter {filename}: {e}")
 	return None
 
+def _split_chapters(chapters, parts):
+	"""Split chapters into up to parts consecutive runs of similar total length"""
+	total = sum(len(content) for _, content in chapters) or 1
+	groups = [[] for _ in range(parts)]
+	done = 0
+	for chapter in chapters:
+		groups[min(done * parts // total, parts - 1)].append(chapter)
+		done += len(chapter[1])
+	return [group for group in groups if group]
+
+def book_charset(chapters):
+	"""Every character the book can draw, in a fixed order"""
+	chars = set(map(chr, range(0x20, 0x7f)))  # Cover, headers, numbers, messages
+	for title, content in chapters:
+		chars.update(title)
+		chars.update(content)
+	return "".join(sorted(chars))
+
+def render_chapter_group(chapters, font_option, charset):
+	"""Render consecutive chapters as one standalone PDF, without page numbers"""
+	family_name, _, paths = FONT_FAMILIES[font_option]
+	pdf = PDFBook()
+	pdf.number_pages = False
+	_load_font_family(pdf, family_name, paths)
+	pdf.font_preferences = [family_name]
+	pdf.reserve_glyphs(charset)
+	for title, content in chapters:
+		pdf.add_chapter(title, content)
+	return bytes(pdf.output())
+
+def _stamp_page_numbers(book, pdf, first_page, font_option):
+	"""Number the pages of book from first_page on, where pdf's footer would"""
+	# One Font object shared by every page's TextWriter is embedded only once
+	font = fitz.Font(fontfile=FONT_FAMILIES[font_option][2][""])
+	for page_index in range(first_page, len(book)):
+		page = book[page_index]
+		page_number = str(page_index + 1)
+		origin = pdf.page_number_origin(font.text_length(page_number, fontsize=10))
+		writer = fitz.TextWriter(page.rect)
+		writer.append(origin, page_number, font=font, fontsize=10)
+		writer.write_text(page)
+
+def render_chapters_in_parallel(pdf, chapters, font_option, jobs, charset):
+	"""Render chapters in worker processes and append them to the pages of pdf
+
+	Each worker lays out one run of consecutive chapters, loading the fonts
+	once. Layout doesn't depend on where a chapter starts, so the page
+	numbers are left out and stamped on after the runs are joined. pdf and
+	every worker reserve the same charset, so their font subsets match.
+	"""
+	groups = _split_chapters(chapters, jobs)
+	front_pages = pdf.page_no()
+	with concurrent.futures.ProcessPoolExecutor(max_workers=len(groups)) as executor:
+		group_pdfs = executor.map(render_chapter_group, groups, itertools.repeat(font_option), itertools.repeat(charset))
+
+		with fitz.open(stream=bytes(pdf.output()), filetype='pdf') as book:
+			for group_pdf in group_pdfs:
+				with fitz.open(stream=group_pdf, filetype='pdf') as group_doc:
+					book.insert_pdf(group_doc)
+			_stamp_page_numbers(book, pdf, front_pages, font_option)
+			# The stamped numbers embed the whole font file; keep only the digits
+			book.subset_fonts()
+			# Every run embeds its own, identical, copy of each font subset;
+			# garbage=4 merges identical objects and streams on save
+			return book.tobytes(garbage=4, deflate=True)
+
 def main():
 	parser = argparse.ArgumentParser(description="Generate a PDF book with optional testing mode.")
 	parser.add_argument('--test', action='store_true', help="Run in test mode (generate only the first 10 pages)")
 	parser.add_argument('--no-effect', action='store_true', help="Skip applying the photocopy effect")
 	parser.add_argument('--blank-cover', action='store_true', help="Use a blank cover page without image")
-	parser.add_argument('--font', choices=['garamond', 'times', 'dejavu', 'noto'],
+	parser.add_argument('--lossless', action='store_true',
+					   help="Embed photocopied pages losslessly instead of as JPEG (best quality; output is several times larger and slower to write)")
+	parser.add_argument('--font', choices=list(FONT_FAMILIES),
 					   default='garamond', help="Choose the font family (default: garamond)")
 	parser.add_argument('--chapters', type=str, help="Specify chapters to include (e.g. '1,3-5' for chapters 1,3,4,5)")
+	parser.add_argument('--jobs', type=int, default=1, help="Render chapters in this many worker processes (default: 1)")
 	args = parser.parse_args()
 
 	# Parse chapter selection if specified
@@ -74,91 +201,51 @@ def main():
 				selected_chapters.add(int(part))
 
 	# Collect chapters
-	chapter_files = sorted([file for file in glob.glob("*.txt") if re.match(r'\d+_', file)])
+	chapter_files = sorted(entry.name for entry in os.scandir('.') if _is_chapter_file(entry))
 
-	chapters = []
-	for i, filename in enumerate(chapter_files, start=1):
-		if args.chapters and i not in selected_chapters:
-			continue
-		try:
-			with open(filename, "r", encoding="utf-8") as file:
-				title_line = file.readline().strip()
-				title = title_line.strip("# ").replace(f"Chapter {i}:", "").strip()
-				content = file.read()
-				chapters.append((title, content))
-		except FileNotFoundError:
-			print(f"Warning: Chapter file {filename} not found")
-		except Exception as e:
-			print(f"Error processing chapter {filename}: {e}")
+	selected_files = [filename for i, filename in enumerate(chapter_files, start=1)
+					  if not args.chapters or i in selected_chapters]
+	with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+		chapters = [chapter for chapter in executor.map(_load_chapter, selected_files) if chapter]
 
 	pdf = PDFBook(blank_cover=args.blank_cover)
 	pdf.font_preferences = []
-	fonts_loaded = False
-
-	if args.font == 'garamond':
-		regular_font = "/usr/share/fonts/truetype/ebgaramond/EBGaramond12-Regular.ttf"
-		bold_font = "/usr/share/fonts/truetype/ebgaramond/EBGaramond12-Bold.ttf"
-		italic_font = "/usr/share/fonts/truetype/ebgaramond/EBGaramond12-Italic.ttf"
-
-		if all(os.path.exists(f) for f in [regular_font, bold_font, italic_font]):
-			try:
-				pdf.add_font("EBGaramond", "", regular_font)
-				pdf.add_font("EBGaramond", "B", bold_font)
-				pdf.add_font("EBGaramond", "I", italic_font)
-				fonts_loaded = True
-				print("EB Garamond fonts loaded successfully")
-				pdf.font_preferences.append("EBGaramond")
-			except RuntimeError as e:
-				print(f"Could not load EB Garamond fonts: {e}")
-		else:
-			print("Could not find EB Garamond font files. Make sure fonts-ebgaramond is installed.")
-			
-	if args.font == 'times' or (args.font == 'garamond' and not fonts_loaded):
-		try:
-			pdf.add_font("TimesNewRoman", "", "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf")
-			pdf.add_font("TimesNewRoman", "B", "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Bold.ttf")
-			pdf.add_font("TimesNewRoman", "I", "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Italic.ttf")
-			fonts_loaded = True
-			print("Times New Roman fonts loaded successfully")
-			pdf.font_preferences.append("TimesNewRoman")
-		except RuntimeError as e:
-			print(f"Could not load Times New Roman fonts: {e}")
 
-	if args.font == 'dejavu' or not fonts_loaded:
+	# Try the requested family first, then the ones after it in fallback order
+	font_options = list(FONT_FAMILIES)
+	for option in font_options[font_options.index(args.font):]:
+		family_name, display_name, paths = FONT_FAMILIES[option]
 		try:
-			pdf.add_font("DejaVuSerif", "", "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf")
-			pdf.add_font("DejaVuSerif", "B", "/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf") 
-			pdf.add_font("DejaVuSerif", "I", "/usr/share/fonts/truetype/dejavu/DejaVuSerif-Italic.ttf")
-			fonts_loaded = True
-			print("DejaVu Serif fonts loaded successfully")
-			pdf.font_preferences.append("DejaVuSerif")
+			if _load_font_family(pdf, family_name, paths):
+				print(f"{display_name} fonts loaded successfully")
+				pdf.font_preferences.append(family_name)
+				font_option = option
+				break
+			print(f"Could not find {display_name} font files.")
 		except RuntimeError as e:
-			print(f"Could not load DejaVu Serif fonts: {e}")
-
-	if args.font == 'noto' or not fonts_loaded:
-		try:
-			pdf.add_font("NotoSerif", "", "/usr/share/fonts/truetype/noto/NotoSerif-Regular.ttf")
-			pdf.add_font("NotoSerif", "B", "/usr/share/fonts/truetype/noto/NotoSerif-Bold.ttf")
-			pdf.add_font("NotoSerif", "I", "/usr/share/fonts/truetype/noto/NotoSerif-Italic.ttf")
-			fonts_loaded = True
-			print("Noto Serif fonts loaded successfully")
-			pdf.font_preferences.append("NotoSerif")
-		except RuntimeError as e:
-			print(f"Could not load Noto Serif fonts: {e}")
+			print(f"Could not load {display_name} fonts: {e}")
 
 	if not pdf.font_preferences:
 		sys.exit("Error: No fonts could be loaded. Please install at least one of: EB Garamond, Times New Roman, DejaVu Serif, or Noto Serif")
 
+	# Test mode stops after 10 pages, so it always renders in this process
+	parallel = args.jobs > 1 and not args.test and bool(chapters)
+	if parallel:
+		# Reserved before the cover is drawn, so the cover uses the same subsets
+		charset = book_charset(chapters)
+		pdf.reserve_glyphs(charset)
+
 	# Add cover page
 	pdf.add_cover_page()
 
-	# Add chapters and collect TOC entries
-	max_pages = 10 if args.test else None
-	for i, (title, content) in enumerate(chapters, start=1):
-		if max_pages and pdf.page_no() >= max_pages:
-			print("Test mode active: Only the first 10 pages are generated.")
-			break
-		pdf.add_chapter(title, content)
+	if not parallel:
+		# Add chapters and collect TOC entries
+		max_pages = 10 if args.test else None
+		for i, (title, content) in enumerate(chapters, start=1):
+			if max_pages and pdf.page_no() >= max_pages:
+				print("Test mode active: Only the first 10 pages are generated.")
+				break
+			pdf.add_chapter(title, content)
 
 	# Build output filename based on options
 	filename_parts = ["Philosophy_of_Computation"]
@@ -168,6 +255,8 @@ def main():
 		filename_parts.append("no_effect")
 	if args.blank_cover:
 		filename_parts.append("blank_cover")
+	if args.lossless and not args.no_effect:
+		filename_parts.append("lossless")
 	if args.font != 'garamond':  # Only add if not using default font
 		filename_parts.append(args.font)
 	if args.chapters:
@@ -176,19 +265,23 @@ def main():
 	output_pdf = "_".join(filename_parts) + ".pdf"
 
 	try:
+		buf = io.BytesIO()
+		if parallel:
+			buf.write(render_chapters_in_parallel(pdf, chapters, font_option, args.jobs, charset))
+		else:
+			pdf.output(buf)
+		buf.seek(0)
+
 		if args.no_effect:
-			pdf.output(output_pdf)
+			with open(output_pdf, "wb") as file:
+				file.write(buf.getbuffer())
 			print(f"PDF successfully created without photocopy effect: {output_pdf}")
 		else:
-			pdf.output("temp_book.pdf")
-			# Apply photocopy effect to the final PDF
-			apply_photocopy_effect("temp_book.pdf", output_pdf)
-			os.remove("temp_book.pdf")
+			# Hand the rendered PDF to the photocopy effect in memory
+			apply_photocopy_effect(buf, output_pdf, lossless=args.lossless)
 			print(f"PDF successfully created with photocopy effect: {output_pdf}")
 	except Exception as e:
 		print(f"Error saving PDF: {e}")
-		if os.path.exists("temp_book.pdf"):
-			os.remove("temp_book.pdf")
 
 if __name__ == "__main__":
 	main()
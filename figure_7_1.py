@@ -2,46 +2,51 @@
 
 import svgwrite
 
+# Styles shared by every element of the diagram, built once at import
+STYLES = {
+    'box': {
+        'stroke': '#000000',
+        'stroke_width': '2',
+        'fill': 'none',
+        'rx': '10',
+        'ry': '10'
+    },
+    'text': {
+        'font_family': 'Arial',
+        'font_size': '16px',
+        'text_anchor': 'middle'
+    },
+    'title': {
+        'font_family': 'Arial',
+        'font_size': '18px',
+        'font_weight': 'bold',
+        'text_anchor': 'middle'
+    },
+    'bullet': {
+        'font_family': 'Arial',
+        'font_size': '14px'
+    },
+    'arrow': {
+        'stroke': '#000000',
+        'stroke_width': '2',
+        'marker_end': 'url(#arrow)',
+        'fill': 'none'
+    }
+}
+
+def _add_arrow_marker(dwg):
+    # Arrowhead referenced by the 'arrow' style's marker_end
+    marker = dwg.marker(insert=(10, 6), size=(10, 10), orient='auto')
+    marker.add(dwg.path(d='M0,0 L0,12 L10,6 z', fill='#000000'))
+    dwg.defs.add(marker)
+    return marker
+
 def create_interface_diagram(filename="quantum_interface_diagram.svg", width=800, height=300):
     # Create SVG document
     dwg = svgwrite.Drawing(filename, size=(width, height))
     
-    # Define styles
-    styles = {
-        'box': {
-            'stroke': '#000000',
-            'stroke_width': '2',
-            'fill': 'none',
-            'rx': '10',
-            'ry': '10'
-        },
-        'text': {
-            'font_family': 'Arial',
-            'font_size': '16px',
-            'text_anchor': 'middle'
-        },
-        'title': {
-            'font_family': 'Arial',
-            'font_size': '18px',
-            'font_weight': 'bold',
-            'text_anchor': 'middle'
-        },
-        'bullet': {
-            'font_family': 'Arial',
-            'font_size': '14px'
-        },
-        'arrow': {
-            'stroke': '#000000',
-            'stroke_width': '2',
-            'marker_end': 'url(#arrow)',
-            'fill': 'none'
-        }
-    }
-    
     # Define arrow marker
-    marker = dwg.marker(insert=(10, 6), size=(10, 10), orient='auto')
-    marker.add(dwg.path(d='M0,0 L0,12 L10,6 z', fill='#000000'))
-    dwg.defs.add(marker)
+    _add_arrow_marker(dwg)
     
     # Box dimensions and positions
     box_width = 200
@@ -55,14 +60,14 @@ def create_interface_diagram(filename="quantum_interface_diagram.svg", width=800
     titles = ["Quantum Layer", "Interface Layer", "Classical Layer"]
     for i in range(3):
         x = start_x + i * (box_width + box_spacing)
-        box = dwg.rect((x, start_y), (box_width, box_height), **styles['box'])
+        box = dwg.rect((x, start_y), (box_width, box_height), **STYLES['box'])
         boxes.append(box)
         dwg.add(box)
         
         # Add title
         title = dwg.text(titles[i], 
                         insert=(x + box_width/2, start_y - 20),
-                        **styles['title'])
+                        **STYLES['title'])
         dwg.add(title)
     
     # Add content for each box
@@ -78,7 +83,7 @@ def create_interface_diagram(filename="quantum_interface_diagram.svg", width=800
             y = start_y + 50 + j * 30
             dwg.add(dwg.text(text, 
                            insert=(x + 20, y),
-                           **styles['bullet']))
+                           **STYLES['bullet']))
     
     # Add arrows between boxes
     for i in range(2):
@@ -88,11 +93,11 @@ def create_interface_diagram(filename="quantum_interface_diagram.svg", width=800
         
         # Draw double-headed arrow
         arrow_path = f'M {x1} {y} L {x2} {y}'
-        dwg.add(dwg.path(d=arrow_path, **styles['arrow']))
+        dwg.add(dwg.path(d=arrow_path, **STYLES['arrow']))
         
         # Draw arrowhead for opposite direction
         arrow_path_back = f'M {x2} {y} L {x1} {y}'
-        dwg.add(dwg.path(d=arrow_path_back, **styles['arrow']))
+        dwg.add(dwg.path(d=arrow_path_back, **STYLES['arrow']))
     
     # Save the SVG file
     dwg.save()
@@ -20,10 +20,15 @@ Code structure:
 - PDFBook class inherits from FPDF
 - Font handling methods:
   - set_font_with_fallback(): Manages font selection and fallback
+  - font_covers(): Cached check that a font has glyphs for a piece of text
+  - check_latin_support(): Marks fonts that cover all of Basic Latin
+  - reserve_glyphs(): Fixes the font subsets up front, for documents merged later
 - Page structure methods:  
   - header(): Renders page headers based on context
   - footer(): Handles page numbering
+  - page_number_origin(): Where footer() puts a page number, for stamping it later
   - add_cover_page(): Creates cover with image and text
+  - render_cover_png(): Rasterizes the SVG cover, cached on disk
 - Content methods:
   - add_chapter(): Processes chapter content with Markdown
   - write_markdown_line(): Handles line-level Markdown
@@ -31,13 +36,93 @@ Code structure:
 - Helper methods:
   - convert_to_roman(): Generates Roman numerals
   - is_first_page_of_section(): Detects section starts
+- Module helpers:
+  - convert_to_roman(): Memoized, table-driven Roman numeral conversion
+  - parse_markdown(): Memoized tokenizer behind PDFBook.parse_markdown()
+  - iter_content_lines(): Lazily splits chapter text into unwrapped lines
 """
 
+import functools
+import hashlib
+import itertools
+import io
 import os
 import re
+import tempfile
 from fpdf import FPDF, XPos, YPos
 from toc_entry import TOCEntry
 
+COVER_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'pdf_book')
+
+_BASIC_LATIN = ''.join(chr(c) for c in range(0x20, 0x7f))
+
+_RE_IMAGE = re.compile(r'!\[[^\]]*\]\(([^)]*)\)')
+
+_ROMAN_NUMERALS = (
+	(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"),
+	(100, "C"), (90, "XC"), (50, "L"), (40, "XL"),
+	(10, "X"), (9, "IX"), (5, "V"), (4, "IV"),
+	(1, "I")
+)
+
+@functools.lru_cache(maxsize=64)
+def convert_to_roman(num):
+	"""Convert a positive integer to Roman numerals; memoized for per-page footers"""
+	parts = []
+	for value, symbol in _ROMAN_NUMERALS:
+		count, num = divmod(num, value)
+		if count:
+			parts.append(symbol * count)
+	return ''.join(parts)
+
+@functools.lru_cache(maxsize=4096)
+def parse_markdown(text):
+	"""Split a line into (text, style) tokens; cached since lines repeat across chapters"""
+	if '*' not in text:
+		return ((text, ''),) if text else ()
+	tokens = []
+	last_end = 0
+	start = text.find('*')
+	while start != -1:
+		end = text.find('*', start + 1)
+		if end == -1:
+			break
+		if end == start + 1:
+			# Empty emphasis ("**"); the second asterisk may open a span
+			start = end
+			continue
+		if start > last_end:
+			tokens.append((text[last_end:start], ''))
+		tokens.append((text[start + 1:end], 'I'))
+		last_end = end + 1
+		start = text.find('*', last_end)
+	if last_end < len(text):
+		tokens.append((text[last_end:], ''))
+	return tuple(tokens)
+
+def iter_content_lines(content):
+	"""Yield the lines of content, joining soft-wrapped lines with a space.
+
+	A single newline is a soft wrap; a newline next to another newline
+	ends the line, so blank lines between paragraphs are preserved.
+	"""
+	parts = []
+	pos = 0
+	end = len(content)
+	while True:
+		i = content.find('\n', pos)
+		if i == -1:
+			parts.append(content[pos:])
+			yield ''.join(parts)
+			return
+		parts.append(content[pos:i])
+		if (i + 1 < end and content[i + 1] == '\n') or (i > 0 and content[i - 1] == '\n'):
+			yield ''.join(parts)
+			parts = []
+		else:
+			parts.append(' ')
+		pos = i + 1
+
 class PDFBook(FPDF):
 	def __init__(self, blank_cover=False):
 		super().__init__()
@@ -53,6 +138,51 @@ class PDFBook(FPDF):
 		self.font_preferences = []  # Start empty, will be populated with successfully loaded fonts
 		self.active_font = None
 		self.blank_cover = blank_cover
+		self.number_pages = True  # False when page numbers are stamped on after joining
+		self._glyph_ok = {}  # (font, style, unicode block) -> font has glyphs for it
+		self._last_font_key = None
+		self._latin_safe = set()  # Fonts known to have every Basic Latin glyph
+
+	def set_font(self, family=None, style="", size=0):
+		# FPDF re-resolves the font and emits state on every call, so skip
+		# calls that would not change anything. FPDF's own calls on page
+		# breaks also come through here, keeping the key in sync; the key is
+		# normalized like FPDF does (lower-case family, TextEmphasis styles)
+		# so those restores and our own calls share it. A new page clears
+		# font_family, which always forces the real call.
+		style = getattr(style, "style", style)
+		key = ((family or self.font_family).lower(), style.upper(), size or self.font_size_pt)
+		if key == self._last_font_key and self.font_family:
+			return
+		super().set_font(family, style, size)
+		self._last_font_key = key
+
+	def check_latin_support(self, font):
+		# Probe Basic Latin once at load time so ASCII text never needs measuring
+		self.set_font(font, "", 12)
+		if all(self.get_string_width(char) > 0 for char in _BASIC_LATIN):
+			self._latin_safe.add(font)
+
+	def reserve_glyphs(self, chars):
+		# FPDF numbers subset glyphs in order of first use. Picking the same
+		# characters in the same order before any text is written gives
+		# documents rendered separately byte-identical font subsets, which
+		# merge into one copy when the documents are joined.
+		for font in self.fonts.values():
+			for char in chars:
+				if font.subset.get_glyph(unicode=ord(char)) is not None:
+					font.subset.pick(ord(char))
+
+	def font_covers(self, font, style, text):
+		if font in self._latin_safe and text.isascii():
+			return True
+		# Glyph coverage is cached per Unicode block of the first character,
+		# so a run of text in one script is only measured once per font
+		key = (font, style, ord(text[0]) >> 8)
+		covered = self._glyph_ok.get(key)
+		if covered is None:
+			covered = self._glyph_ok[key] = self.get_string_width(text) > 0
+		return covered
 
 	def set_font_with_fallback(self, style, size, text=""):
 		if not self.active_font:
@@ -60,7 +190,7 @@ class PDFBook(FPDF):
 			for font in self.font_preferences:
 				try:
 					self.set_font(font, style, size)
-					if not text or self.get_string_width(text) > 0:
+					if not text or self.font_covers(font, style, text):
 						self.active_font = font
 						break
 				except RuntimeError:
@@ -71,13 +201,13 @@ class PDFBook(FPDF):
 			# Check if current font can handle the text
 			try:
 				self.set_font(self.active_font, style, size)
-				if text and self.get_string_width(text) == 0:
+				if text and not self.font_covers(self.active_font, style, text):
 					# Current font missing glyphs, try others
 					for font in self.font_preferences:
 						if font != self.active_font:
 							try:
 								self.set_font(font, style, size)
-								if self.get_string_width(text) > 0:
+								if self.font_covers(font, style, text):
 									self.active_font = font
 									break
 							except RuntimeError:
@@ -124,6 +254,8 @@ class PDFBook(FPDF):
 			pass  # No page number on cover page
 		elif self.is_toc_page:
 			pass  # No page number on TOC page
+		elif not self.number_pages:
+			pass  # Stamped on once the chapters are joined
 		elif page_no > 1:
 			# Use Roman numerals for front matter, regular numbers for chapters
 			if self.chapter_start_page is None:
@@ -133,27 +265,16 @@ class PDFBook(FPDF):
 			self.set_font_with_fallback("", 10, page_number)
 			self.cell(0, 10, page_number, align="C")
 
+	def page_number_origin(self, text_width):
+		# Baseline origin, in points from the top left, of a page number
+		# text_width points wide as footer() places it: centered in a 10 mm
+		# cell 25 mm from the bottom, in 10 pt (FPDF.cell's placement)
+		x = self.l_margin + (self.epw - text_width / self.k) / 2
+		y = self.h - 25 + 0.5 * 10 + 0.3 * 10 / self.k
+		return x * self.k, y * self.k
+
 	def convert_to_roman(self, num):
-		val = [
-			1000, 900, 500, 400,
-			100, 90, 50, 40,
-			10, 9, 5, 4,
-			1
-		]
-		syms = [
-			"M", "CM", "D", "CD",
-			"C", "XC", "L", "XL",
-			"X", "IX", "V", "IV",
-			"I"
-		]
-		roman_num = ''
-		i = 0
-		while num > 0:
-			for _ in range(num // val[i]):
-				roman_num += syms[i]
-				num -= val[i]
-			i += 1
-		return roman_num
+		return convert_to_roman(num)
 
 	def add_cover_page(self):
 		self.add_page()
@@ -163,14 +284,13 @@ class PDFBook(FPDF):
 
 		# Try SVG first, then fall back to JPG if SVG fails
 		try:
-			import cairosvg
 			from PIL import Image
 			import io
 
 			# Convert SVG to PNG in memory
 			svg_path = 'cover.svg'
 			if os.path.exists(svg_path):
-				png_data = cairosvg.svg2png(url=svg_path)
+				png_data = self.render_cover_png(svg_path)
 
 				# Create PIL Image from PNG data
 				cover_image = Image.open(io.BytesIO(png_data))
@@ -187,16 +307,8 @@ class PDFBook(FPDF):
 				x = (self.w - (img_width * scale)) / 2
 				y = (self.h - (img_height * scale)) / 2
 
-				# Save temporary PNG file
-				temp_png = "temp_cover.png"
-				with open(temp_png, "wb") as f:
-					f.write(png_data)
-
 				# Add image to PDF
-				self.image(temp_png, x, y, w=img_width * scale)
-
-				# Clean up temporary file
-				os.remove(temp_png)
+				self.image(io.BytesIO(png_data), x, y, w=img_width * scale)
 				return
 
 		except (ImportError, Exception) as e:
@@ -229,6 +341,40 @@ class PDFBook(FPDF):
 		self.cell(0, 10, publisher, align="C")
 		self.set_text_color(0)
 
+	def render_cover_png(self, svg_path):
+		# Rasterizing the SVG is slow, so keep the PNG cached by content hash
+		with open(svg_path, "rb") as f:
+			key = hashlib.sha256(f.read()).hexdigest()[:16]
+		cache_path = os.path.join(COVER_CACHE_DIR, f"cover_{key}.png")
+		if os.path.exists(cache_path):
+			with open(cache_path, "rb") as f:
+				png_data = f.read()
+			try:
+				from PIL import Image
+				Image.open(io.BytesIO(png_data)).load()
+				return png_data
+			except Exception as e:
+				# A damaged entry would otherwise break every later build
+				print(f"Discarding unreadable cached cover image: {e}")
+				os.remove(cache_path)
+
+		import cairosvg
+		png_data = cairosvg.svg2png(url=svg_path)
+		tmp_path = None
+		try:
+			os.makedirs(COVER_CACHE_DIR, exist_ok=True)
+			# Write to a temporary file and rename it into place, so an
+			# interrupted or concurrent build never leaves a partial entry
+			with tempfile.NamedTemporaryFile(dir=COVER_CACHE_DIR, suffix=".tmp", delete=False) as f:
+				tmp_path = f.name
+				f.write(png_data)
+			os.replace(tmp_path, cache_path)
+		except OSError as e:
+			print(f"Could not cache cover image: {e}")
+			if tmp_path and os.path.exists(tmp_path):
+				os.remove(tmp_path)
+		return png_data
+
 	def add_chapter(self, title, content):
 		# Update chapter_start_page to the next chapter's start page
 		self.chapter_start_page = self.page_no() + 1
@@ -242,9 +388,7 @@ class PDFBook(FPDF):
 
 		# Reset to normal text font for chapter content
 		self.set_font_with_fallback("", 12)
-		content = re.sub(r'(?<!\n)\n(?!\n)', ' ', content)
-		lines = content.split('\n')
-		for line in lines:
+		for line in iter_content_lines(content):
 			line = line.strip()
 			if not line:
 				self.ln(4)
@@ -256,10 +400,9 @@ class PDFBook(FPDF):
 				self.cell(0, 10, subheading, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 				self.ln(2)
 				self.set_font_with_fallback("", 12)
-			elif re.match(r'!\[.*\]\(.*\)', line):
+			elif image_match := _RE_IMAGE.match(line):
 				# Image
-				match = re.match(r'!\[.*\]\((.*)\)', line)
-				image_path = match.group(1)
+				image_path = image_match.group(1)
 				if os.path.exists(image_path):
 					self.image(image_path, w=self.epw)
 					self.ln(5)
@@ -275,22 +418,21 @@ class PDFBook(FPDF):
 
 	def write_markdown_line(self, text):
 		tokens = self.parse_markdown(text)
-		for token_text, style in tokens:
-			self.set_font_with_fallback(style, 12, token_text)
-			self.write(6, token_text)
+		# Fold consecutive tokens of the same style into a single run
+		runs = [(''.join(token_text for token_text, _ in group), style)
+				for style, group in itertools.groupby(tokens, key=lambda token: token[1])]
+		if len(runs) == 1:
+			# Single style for the whole line: one multi_cell instead of write() + ln()
+			run_text, style = runs[0]
+			self.set_font_with_fallback(style, 12, run_text)
+			self.multi_cell(0, 6, run_text, align="L", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+			return
+		for run_text, style in runs:
+			self.set_font_with_fallback(style, 12, run_text)
+			self.write(6, run_text)
 		self.ln()  # Add line break at the end of the complete line
 
 	def parse_markdown(self, text):
-		tokens = []
-		pattern = re.compile(r'(\*[^*]+\*)')
-		last_end = 0
-		for match in pattern.finditer(text):
-			if match.start() > last_end:
-				tokens.append((text[last_end:match.start()], ''))
-			tokens.append((match.group(1).strip('*'), 'I'))
-			last_end = match.end()
-		if last_end < len(text):
-			tokens.append((text[last_end:], ''))
-		return tokens
+		return parse_markdown(text)
 
 # end pdf_book.py
\ No newline at end of file
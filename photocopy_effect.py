@@ -22,390 +22,446 @@ Each page is processed individually with randomized variations to avoid repetiti
 patterns.
 
 Main function:
-apply_photocopy_effect(input_pdf_path, output_pdf_path, color_mode='mono')
-    - Processes a PDF file and applies the photocopy effect to each page
+apply_photocopy_effect(input_pdf, output_pdf_path, color_mode='mono', max_workers=None, render_scale=1.5, lossless=False)
+    - Processes a PDF (file path or file-like object) and applies the photocopy
+      effect to each page
     - color_mode can be 'mono' for black & white or 'color' for color copies
+    - render_scale is the resolution pages are rasterized at, relative to
+      72 dpi (1.5 = 108 dpi); the photocopy grain hides anything finer
+    - Pages are embedded as JPEG unless lossless is set, which embeds the exact
+      pixels, Flate-compressed; that is for quality, not speed: output is
+      several times larger and slower to save
+    - Pages are rendered and processed in parallel by max_workers processes
+      (default: one per CPU), each with its own copy of the document
 """
 
+import concurrent.futures
+import functools
+import os
+
 import fitz
-from PIL import Image, ImageOps, ImageEnhance, ImageDraw, ImageFilter, ImageChops
+from PIL import Image, ImageOps, ImageDraw, ImageFilter
 import numpy as np
 from scipy.ndimage import map_coordinates
 from io import BytesIO
 
-def apply_photocopy_effect(input_pdf_path, output_pdf_path, color_mode='mono'):
-	def add_photocopy_effect(image, page_number):
-		width, height = image.size
-
-		# Convert to appropriate color mode
-		if color_mode == 'mono':
-			image = image.convert('L')
-		else:
-			image = image.convert('RGB')
-
-		is_odd_page = (page_number % 2) == 1
-		binding_side = 'left' if is_odd_page else 'right'
-
-		# Add toner smudges BEFORE other effects
-		image = add_toner_smudges(image, page_number, color_mode)
-
-		image = simulate_page_curl(image, binding_side)
-		image = add_dark_edges(image, binding_side)
-
-		angle = np.random.uniform(-0.5, 0.5)
-		if color_mode == 'mono':
-			bg_color = int(np.median(np.array(image)))
-		else:
-			bg_color = tuple(map(int, np.median(np.array(image), axis=(0,1))))
-
-		image = image.rotate(angle, expand=True, fillcolor=bg_color)
-
-		left = (image.width - width) // 2
-		top = (image.height - height) // 2
-		image = image.crop((left, top, left + width, top + height))
-
-		image = add_noise(image)
-		image = add_scanlines(image)
-		image = adjust_brightness_based_on_text(image)
-
-		if color_mode == 'mono':
-			image = image.convert('RGB')
-		return image
-
-	def add_toner_smudges(image, page_number, color_mode='mono'):
-		width, height = image.size
+try:
+	import cv2  # SIMD remap and blur; SciPy and PIL are used when it is missing
+except ImportError:
+	cv2 = None
 
-		# Create a new layer for smudges
-		if color_mode == 'mono':
-			smudge_layer = Image.new('L', (width, height), 255)
-		else:
-			smudge_layer = Image.new('RGB', (width, height), (255, 255, 255))
+def _multiply(arr, layer):
+	# Same as ImageChops.multiply, on uint8 arrays
+	product = arr.astype(np.uint16) * layer
+	return ((product + 127) // 255).astype(np.uint8)
 
-		draw = ImageDraw.Draw(smudge_layer)
+def _gaussian_blur(arr, radius):
+	# OpenCV's exact kernel grows with the radius while PIL's box approximation
+	# costs the same at any radius; they break even around 6 px on a page.
+	# PIL's radius is the sigma.
+	if cv2 is not None and radius < 6:
+		return cv2.GaussianBlur(arr, (0, 0), sigmaX=radius, borderType=cv2.BORDER_REFLECT)
+	return np.asarray(Image.fromarray(arr).filter(ImageFilter.GaussianBlur(radius=radius)))
 
-		# For testing, make it appear more frequently
-		smudge_probability = 0.1  # Temporary high probability for testing
-		#print(f"Page {page_number}: Smudge probability {smudge_probability}")
+def add_photocopy_effect(arr, page_number, color_mode='mono'):
+	# arr is the rendered page as a uint8 array (HxW for mono, HxWx3 for color);
+	# the effects below all work on it and only wrap it in PIL images where PIL
+	# is needed
+	height, width = arr.shape[:2]
 
-		if np.random.random() < smudge_probability:
-			#print(f"Page {page_number}: Creating smudge")
-			# Parameters for the band of vertical lines
-			band_y = np.random.randint(height // 8, height // 2)
-			band_height = np.random.randint(50, 70)
+	is_odd_page = (page_number % 2) == 1
+	binding_side = 'left' if is_odd_page else 'right'
 
-			margin = width * 0.05
-			printable_width = width - 2 * margin
+	# Add toner smudges BEFORE other effects
+	arr = add_toner_smudges(arr, page_number, color_mode)
 
-			# Increase line density for testing
-			line_density = 0.8
-			num_lines = int(printable_width * line_density)
+	arr = simulate_page_curl(arr, binding_side)
+	arr = add_dark_edges(arr, binding_side)
 
-			if color_mode == 'mono':
-				# Make slightly darker for testing
-				base_intensity = np.random.randint(215, 225)
+	angle = np.random.uniform(-0.5, 0.5)
+	if arr.ndim == 2:
+		bg_color = int(np.median(arr))
+	else:
+		bg_color = tuple(map(int, np.median(arr, axis=(0,1))))
 
-				for i in range(num_lines):
-					x = margin + (i * printable_width / num_lines) + np.random.uniform(-1, 1)
-					line_height = band_height + np.random.randint(-5, 5)
+	image = Image.fromarray(arr).rotate(angle, expand=True, fillcolor=bg_color)
 
-					# Calculate fade-in over first 20% of height
-					fade_height = line_height * 0.7
-					for y_offset in range(line_height):
-						if y_offset < fade_height:
-							# Gradually increase intensity during fade-in
-							fade_factor = y_offset / fade_height
-							current_intensity = int(255 - ((255 - base_intensity) * fade_factor))
-						else:
-							# Full intensity for the rest
-							current_intensity = base_intensity
+	left = (image.width - width) // 2
+	top = (image.height - height) // 2
+	arr = np.asarray(image.crop((left, top, left + width, top + height)))
 
-						current_intensity += np.random.randint(-3, 3)  # Add slight variation
-						current_intensity = min(255, max(220, current_intensity))
+	arr = add_noise(arr)
+	arr = add_scanlines(arr)
+	arr = adjust_brightness_based_on_text(arr)
 
-						# Draw single pixel
-						draw.point((x, band_y + y_offset), fill=current_intensity)
+	return Image.fromarray(arr)
 
-			else:
-				colors = {
-					'cyan': (230, 255, 255),
-					'magenta': (255, 230, 255),
-					'yellow': (255, 255, 230),
-					'black': (230, 230, 230)
-				}
-
-				color_name = np.random.choice(list(colors.keys()))
-				base_color = colors[color_name]
-				#print(f"Page {page_number}: Using color {color_name}")
-
-				for i in range(num_lines):
-					x = margin + (i * printable_width / num_lines) + np.random.uniform(-1, 1)
-					line_height = band_height + np.random.randint(-5, 5)
-
-					fade_height = line_height * 0.2
-					for y_offset in range(line_height):
-						if y_offset < fade_height:
-							fade_factor = y_offset / fade_height
-							current_color = tuple(int(255 - ((255 - c) * fade_factor)) for c in base_color)
-						else:
-							current_color = base_color
-
-						# Add slight variation
-						color_variation = np.random.randint(-3, 3)
-						current_color = tuple(min(255, max(220, c + color_variation)) for c in current_color)
-
-						draw.point((x, band_y + y_offset), fill=current_color)
-
-
-			# Very light Gaussian blur to softly blend the lines
-			smudge_layer = smudge_layer.filter(ImageFilter.GaussianBlur(radius=0.5))
-
-			# Blend smudge layer with original image
-			if color_mode == 'mono':
-				result = ImageChops.multiply(image, smudge_layer)
-				#print(f"Page {page_number}: Applied monochrome blend")
-				return result
-			else:
-				result = Image.blend(image, smudge_layer, 0.3)  # Increased blend factor for testing
-				#print(f"Page {page_number}: Applied color blend")
-				return result
+def add_toner_smudges(arr, page_number, color_mode='mono'):
+	height, width = arr.shape[:2]
 
-		#print(f"Page {page_number}: No smudge applied")
-		return image  # Return original image if no smudge was applied
+	# For testing, make it appear more frequently
+	smudge_probability = 0.1  # Temporary high probability for testing
+	#print(f"Page {page_number}: Smudge probability {smudge_probability}")
 
+	# Roll the die before creating anything, so most pages cost nothing here
+	if np.random.random() < smudge_probability:
+		#print(f"Page {page_number}: Creating smudge")
+		# Create a new layer for smudges
+		smudge_layer = np.full(arr.shape, 255, dtype=np.uint8)
 
-	def simulate_page_curl(image, binding_side):
-		width, height = image.size
-		displacement = np.zeros((height, width, 2), dtype=np.float32)
+		# Parameters for the band of vertical lines
+		band_y = np.random.randint(height // 8, height // 2)
+		band_height = np.random.randint(50, 70)
 
-		# Parameters for the curl effect
-		max_vertical_curl = height * 0.015  # Increased vertical displacement
-		max_horizontal_curl = width * 0.008  # Added horizontal displacement
-		curl_frequency = 1.2  # Controls how rapid the curl is
+		margin = width * 0.05
+		printable_width = width - 2 * margin
 
-		# Create coordinate grids
-		x_coords = np.linspace(0, 1, width)
-		y_coords = np.linspace(0, 1, height)
-		X, Y = np.meshgrid(x_coords, y_coords)
+		# Increase line density for testing
+		line_density = 0.8
+		num_lines = int(printable_width * line_density)
 
-		# Calculate distance from binding edge
-		if binding_side == 'left':
-			distance = X
+		if color_mode == 'mono':
+			# Make slightly darker for testing
+			base_color = np.array([np.random.randint(215, 225)])
+			# Calculate fade-in over first 70% of height
+			fade_fraction = 0.7
 		else:
-			distance = 1 - X
-
-		# Vertical displacement (page curl)
-		vertical_curl = max_vertical_curl * np.sin(np.pi * distance * curl_frequency)
-		vertical_curl *= (1 - Y * 0.3)  # Reduce effect towards bottom of page
-
-		# Horizontal displacement (page bend)
-		horizontal_curl = max_horizontal_curl * (1 - np.cos(np.pi * distance * curl_frequency))
-		if binding_side == 'right':
-			horizontal_curl = -horizontal_curl
-
-		# Apply graduated effect
-		edge_factor = np.exp(-distance * 3)  # Stronger effect near binding
-		vertical_curl *= edge_factor
-		horizontal_curl *= edge_factor
-
-		# Add subtle wave effect
-		wave_amplitude = height * 0.003
-		wave_frequency = 4
-		wave = wave_amplitude * np.sin(2 * np.pi * Y * wave_frequency)
-		vertical_curl += wave * edge_factor
-
-		# Apply displacements
-		displacement[:, :, 0] = horizontal_curl  # X displacement
-		displacement[:, :, 1] = vertical_curl    # Y displacement
-
-		# Apply the warping
-		arr = np.array(image)
-		coords = np.indices((height, width), dtype=np.float32)
-		coords[0] += displacement[:, :, 1]
-		coords[1] += displacement[:, :, 0]
-
-		# Use higher order interpolation for smoother results
-		warped_arr = map_coordinates(arr, [coords[0], coords[1]], order=3, mode='reflect')
+			colors = {
+				'cyan': (230, 255, 255),
+				'magenta': (255, 230, 255),
+				'yellow': (255, 255, 230),
+				'black': (230, 230, 230)
+			}
+
+			color_name = np.random.choice(list(colors.keys()))
+			base_color = np.array(colors[color_name])
+			#print(f"Page {page_number}: Using color {color_name}")
+			fade_fraction = 0.2
+
+		# One column of pixels per line: position, height and fade-in length
+		xs = margin + np.arange(num_lines) * printable_width / num_lines + np.random.uniform(-1, 1, num_lines)
+		xs = np.clip(xs.astype(np.intp), 0, width - 1)
+		line_heights = band_height + np.random.randint(-5, 5, num_lines)
+		y_offsets = np.arange(line_heights.max())[:, None]
+
+		# Gradually increase intensity during fade-in, full intensity for the rest
+		fade_factor = np.minimum(y_offsets / (line_heights * fade_fraction), 1)
+		band = (255 - (255 - base_color) * fade_factor[:, :, None]).astype(np.int16)
+		band += np.random.randint(-3, 3, fade_factor.shape, dtype=np.int16)[:, :, None]  # Add slight variation
+		band = np.clip(band, 220, 255).astype(np.uint8)
+
+		# Scatter the line pixels into the band of the smudge layer
+		rows = min(len(y_offsets), height - band_y)
+		visible = (y_offsets < line_heights)[:rows]
+		layer_band = smudge_layer[band_y:band_y + rows].reshape(rows, width, -1)
+		row_idx, line_idx = np.nonzero(visible)
+		layer_band[row_idx, xs[line_idx]] = band[row_idx, line_idx]
+
+		# Very light Gaussian blur to softly blend the lines
+		smudge_layer = _gaussian_blur(smudge_layer, 0.5)
+
+		# Blend smudge layer with original image
+		if color_mode == 'mono':
+			result = _multiply(arr, smudge_layer)
+			#print(f"Page {page_number}: Applied monochrome blend")
+			return result
+		else:
+			# Increased blend factor for testing
+			result = (arr * 0.7 + smudge_layer * 0.3 + 0.5).astype(np.uint8)
+			#print(f"Page {page_number}: Applied color blend")
+			return result
+
+	#print(f"Page {page_number}: No smudge applied")
+	return arr  # Return original image if no smudge was applied
+
+
+@functools.lru_cache(maxsize=4)
+def _make_curl_displacement(width, height, binding_side):
+	# The curl only depends on the page size and binding side, which repeat
+	# for every page of a book, so the trigonometry runs once per combination
+	displacement = np.zeros((height, width, 2), dtype=np.float32)
+
+	# Parameters for the curl effect
+	max_vertical_curl = height * 0.015  # Increased vertical displacement
+	max_horizontal_curl = width * 0.008  # Added horizontal displacement
+	curl_frequency = 1.2  # Controls how rapid the curl is
+
+	# Create coordinate grids
+	x_coords = np.linspace(0, 1, width)
+	y_coords = np.linspace(0, 1, height)
+	X, Y = np.meshgrid(x_coords, y_coords)
+
+	# Calculate distance from binding edge
+	if binding_side == 'left':
+		distance = X
+	else:
+		distance = 1 - X
+
+	# Vertical displacement (page curl)
+	vertical_curl = max_vertical_curl * np.sin(np.pi * distance * curl_frequency)
+	vertical_curl *= (1 - Y * 0.3)  # Reduce effect towards bottom of page
+
+	# Horizontal displacement (page bend)
+	horizontal_curl = max_horizontal_curl * (1 - np.cos(np.pi * distance * curl_frequency))
+	if binding_side == 'right':
+		horizontal_curl = -horizontal_curl
+
+	# Apply graduated effect
+	edge_factor = np.exp(-distance * 3)  # Stronger effect near binding
+	vertical_curl *= edge_factor
+	horizontal_curl *= edge_factor
+
+	# Add subtle wave effect
+	wave_amplitude = height * 0.003
+	wave_frequency = 4
+	wave = wave_amplitude * np.sin(2 * np.pi * Y * wave_frequency)
+	vertical_curl += wave * edge_factor
+
+	# Apply displacements
+	displacement[:, :, 0] = horizontal_curl  # X displacement
+	displacement[:, :, 1] = vertical_curl    # Y displacement
+
+	# Sampling coordinates for the warp
+	coords = np.indices((height, width), dtype=np.float32)
+	coords[0] += displacement[:, :, 1]
+	coords[1] += displacement[:, :, 0]
+	coords.flags.writeable = False
+	return coords[0], coords[1]
+
+def simulate_page_curl(arr, binding_side):
+	height, width = arr.shape[:2]
+	coords_y, coords_x = _make_curl_displacement(width, height, binding_side)
+
+	# Apply the warping with higher order interpolation for smoother results
+	if cv2 is not None:
+		warped_arr = cv2.remap(arr, coords_x, coords_y, cv2.INTER_CUBIC, borderMode=cv2.BORDER_REFLECT)
+	else:
+		warped_arr = map_coordinates(arr, [coords_y, coords_x], order=3, mode='reflect')
 		warped_arr = np.clip(warped_arr, 0, 255).astype(np.uint8)
-		warped_image = Image.fromarray(warped_arr)
-
-		# Round corners after warping
-		warped_image = round_corners(warped_image, binding_side)
-
-		return warped_image
 
-	def round_corners(image, binding_side):
-		width, height = image.size
-		mask = Image.new('L', (width, height), 255)
-		draw = ImageDraw.Draw(mask)
-		radius = width * 0.03
-		# Add corner rounding on both top and bottom of binding side
+	# Round corners after warping
+	warped_image = round_corners(Image.fromarray(warped_arr), binding_side)
+
+	return np.asarray(warped_image)
+
+def round_corners(image, binding_side):
+	width, height = image.size
+	mask = Image.new('L', (width, height), 255)
+	draw = ImageDraw.Draw(mask)
+	radius = width * 0.03
+	# Add corner rounding on both top and bottom of binding side
+	if binding_side == 'left':
+		draw.pieslice([0, 0, 2 * radius, 2 * radius], 180, 270, fill=0)
+		draw.pieslice([0, height - 2 * radius, 2 * radius, height], 90, 180, fill=0)
+	else:
+		draw.pieslice([width - 2 * radius, 0, width, 2 * radius], 270, 360, fill=0)
+		draw.pieslice([width - 2 * radius, height - 2 * radius, width, height], 0, 90, fill=0)
+	image.putalpha(mask)
+	image = image.convert('L')
+	return image
+
+def add_dark_edges(arr, binding_side):
+	height, width = arr.shape[:2]
+	edge_width = int(min(width, height) * 0.02)
+
+	# Create base edge mask for all sides: graduated by distance from the border
+	border_x = np.minimum(np.arange(width), np.arange(width)[::-1])
+	border_y = np.minimum(np.arange(height), np.arange(height)[::-1])
+	distance = np.minimum.outer(border_y, border_x)
+	ramp = (1 - (distance / max(edge_width, 1)) ** 1.5).clip(0, 1)  # More pronounced gradient
+	edge_mask = np.where(distance < edge_width, 255 * ramp, 255).astype(np.uint8)
+
+	# Blur the edge mask
+	edge_mask_blurred = _gaussian_blur(edge_mask, edge_width / 2)
+	arr = _multiply(arr, edge_mask_blurred)
+
+	# Enhanced binding shadow effect
+	shadow = Image.new('L', (width, height), color=255)
+	draw_shadow = ImageDraw.Draw(shadow)
+
+	# Create wider shadow for binding
+	binding_width = edge_width * 4  # Wider binding shadow
+
+	# Create graduated binding shadow: the base curve across the binding
+	# times a vertical variation, darker in the middle and lighter at edges
+	progress = np.arange(binding_width) / binding_width
+	base_intensity = 255 - (255 * (1 - progress) ** 0.7)  # Adjusted curve
+	y_variation = 1 - 0.15 * np.sin(np.pi * np.arange(height) / height)
+	gradient = np.clip(np.outer(y_variation, base_intensity), 0, 255).astype(np.uint8)
+	shadow_gradient = Image.fromarray(gradient)
+	shadow_draw = ImageDraw.Draw(shadow_gradient)
+
+	# Add subtle vertical bands for book binding texture
+	num_bands = 30
+	band_width = height / num_bands
+	for i in range(num_bands):
+		y_pos = int(i * band_width)
+		band_height = int(band_width * 0.8)
+		band_intensity = np.random.randint(0, 20)  # Subtle variation
+		shadow_draw.rectangle([0, y_pos, binding_width//2, y_pos + band_height],
+							fill=255-band_intensity, outline=255-band_intensity)
+
+	# Apply Gaussian blur to smooth the binding texture
+	shadow_gradient = Image.fromarray(_gaussian_blur(np.asarray(shadow_gradient), 1))
+
+	# Create second layer of shadow for depth
+	deep_shadow_width = int(binding_width * 0.3)
+	deep_shadow = Image.new('L', (deep_shadow_width, height), color=255)
+	deep_shadow_draw = ImageDraw.Draw(deep_shadow)
+
+	# Draw deeper shadow near binding
+	for x in range(deep_shadow_width):
+		intensity = int(255 * (x / deep_shadow_width) ** 0.5)
+		deep_shadow_draw.line([(x, 0), (x, height)], fill=intensity)
+
+	# Combine shadows based on binding side
+	if binding_side == 'left':
+		shadow.paste(shadow_gradient, (0, 0))
+		shadow.paste(deep_shadow, (0, 0), deep_shadow)
+	else:
+		shadow_gradient = shadow_gradient.transpose(Image.FLIP_LEFT_RIGHT)
+		deep_shadow = deep_shadow.transpose(Image.FLIP_LEFT_RIGHT)
+		shadow.paste(shadow_gradient, (width - binding_width, 0))
+		shadow.paste(deep_shadow, (width - deep_shadow_width, 0), deep_shadow)
+
+	# Add subtle page thickness shadow
+	thickness_shadow = Image.new('L', (width, height), color=255)
+	thickness_draw = ImageDraw.Draw(thickness_shadow)
+	thickness_width = edge_width * 2
+
+	for x in range(thickness_width):
+		intensity = int(245 + (x / thickness_width) * 10)  # Very subtle shadow
 		if binding_side == 'left':
-			draw.pieslice([0, 0, 2 * radius, 2 * radius], 180, 270, fill=0)
-			draw.pieslice([0, height - 2 * radius, 2 * radius, height], 90, 180, fill=0)
+			thickness_draw.line([(width - x, 0), (width - x, height)], fill=intensity)
 		else:
-			draw.pieslice([width - 2 * radius, 0, width, 2 * radius], 270, 360, fill=0)
-			draw.pieslice([width - 2 * radius, height - 2 * radius, width, height], 0, 90, fill=0)
-		image.putalpha(mask)
-		image = image.convert('L')
-		return image
-
-	def add_dark_edges(image, binding_side):
-		width, height = image.size
-		edge_width = int(min(width, height) * 0.02)
-
-		# Create base edge mask for all sides
-		edge_mask = Image.new('L', (width, height), 255)
-		draw = ImageDraw.Draw(edge_mask)
-
-		# Draw graduated edges on all sides
-		for i in range(edge_width):
-			shade = int(255 * (1 - (i / edge_width) ** 1.5))  # More pronounced gradient
-			draw.rectangle([i, i, width - i - 1, height - i - 1], outline=shade)
-
-		# Blur the edge mask
-		edge_mask_blurred = edge_mask.filter(ImageFilter.GaussianBlur(radius=edge_width / 2))
-		image = ImageChops.multiply(image, edge_mask_blurred)
-
-		# Enhanced binding shadow effect
-		shadow = Image.new('L', (width, height), color=255)
-		draw_shadow = ImageDraw.Draw(shadow)
-
-		# Create wider shadow for binding
-		binding_width = edge_width * 4  # Wider binding shadow
-		shadow_gradient = Image.new('L', (binding_width, height), color=255)
-		shadow_draw = ImageDraw.Draw(shadow_gradient)
-
-		# Create graduated binding shadow
-		for x in range(binding_width):
-			# Calculate base shadow intensity
-			progress = x / binding_width
-			base_intensity = 255 - (255 * (1 - progress) ** 0.7)  # Adjusted curve
-
-			# Add vertical variation
-			for y in range(height):
-				y_progress = y / height
-				# Darker in the middle, lighter at edges
-				y_variation = 1 - 0.15 * np.sin(np.pi * y_progress)
-				intensity = int(base_intensity * y_variation)
-				intensity = max(0, min(255, intensity))
-				shadow_draw.point((x, y), fill=intensity)
-
-		# Add subtle vertical bands for book binding texture
-		num_bands = 30
-		band_width = height / num_bands
-		for i in range(num_bands):
-			y_pos = int(i * band_width)
-			band_height = int(band_width * 0.8)
-			band_intensity = np.random.randint(0, 20)  # Subtle variation
-			shadow_draw.rectangle([0, y_pos, binding_width//2, y_pos + band_height],
-								fill=255-band_intensity, outline=255-band_intensity)
-
-		# Apply Gaussian blur to smooth the binding texture
-		shadow_gradient = shadow_gradient.filter(ImageFilter.GaussianBlur(radius=1))
-
-		# Create second layer of shadow for depth
-		deep_shadow_width = int(binding_width * 0.3)
-		deep_shadow = Image.new('L', (deep_shadow_width, height), color=255)
-		deep_shadow_draw = ImageDraw.Draw(deep_shadow)
-
-		# Draw deeper shadow near binding
-		for x in range(deep_shadow_width):
-			intensity = int(255 * (x / deep_shadow_width) ** 0.5)
-			deep_shadow_draw.line([(x, 0), (x, height)], fill=intensity)
-
-		# Combine shadows based on binding side
-		if binding_side == 'left':
-			shadow.paste(shadow_gradient, (0, 0))
-			shadow.paste(deep_shadow, (0, 0), deep_shadow)
-		else:
-			shadow_gradient = shadow_gradient.transpose(Image.FLIP_LEFT_RIGHT)
-			deep_shadow = deep_shadow.transpose(Image.FLIP_LEFT_RIGHT)
-			shadow.paste(shadow_gradient, (width - binding_width, 0))
-			shadow.paste(deep_shadow, (width - deep_shadow_width, 0), deep_shadow)
-
-		# Add subtle page thickness shadow
-		thickness_shadow = Image.new('L', (width, height), color=255)
-		thickness_draw = ImageDraw.Draw(thickness_shadow)
-		thickness_width = edge_width * 2
-
-		for x in range(thickness_width):
-			intensity = int(245 + (x / thickness_width) * 10)  # Very subtle shadow
-			if binding_side == 'left':
-				thickness_draw.line([(width - x, 0), (width - x, height)], fill=intensity)
-			else:
-				thickness_draw.line([(x, 0), (x, height)], fill=intensity)
-
-		# Combine all shadows
-		image = ImageChops.multiply(image, shadow)
-		image = ImageChops.multiply(image, thickness_shadow)
-
-		return image
-
-	def add_noise(image):
-		arr = np.array(image).astype(np.float32)
-		noise = np.random.normal(0, 5, arr.shape)
-		arr += noise
-		arr = np.clip(arr, 0, 255).astype(np.uint8)
-		image = Image.fromarray(arr)
-		specks = Image.new('L', image.size, color=0)
-		draw = ImageDraw.Draw(specks)
-		num_specks = int(image.size[0] * image.size[1] * 0.0003)
-		for _ in range(num_specks):
-			x = np.random.randint(0, image.size[0])
-			y = np.random.randint(0, image.size[1])
-			draw.point((x, y), fill=255)
-		image = ImageChops.screen(image, specks)
-		return image
-
-	def add_scanlines(image):
-		# Only add scanlines ~20% of the time
-		if np.random.random() > 0.2:
-			return image
-			
-		width, height = image.size
-		scanlines = Image.new('L', (width, height), 255)
-		draw = ImageDraw.Draw(scanlines)
-
-		# Create clusters of scanlines
-		num_clusters = int(height * 0.002)  # Fewer clusters
-		for _ in range(num_clusters):
-			cluster_center = np.random.randint(0, height)
-			num_lines = np.random.randint(1, 21)  # 1-21 lines per cluster
-			line_spacing = 2  # Closer together
-
-			for i in range(num_lines):
-				y = cluster_center + (i * line_spacing)
-				if 0 <= y < height:
-					intensity = np.random.randint(220, 250)  # Slightly darker lines
-					draw.line([(0, y), (width, y)], fill=intensity)
-
-		image = ImageChops.multiply(image, scanlines)
-		return image
-
-	def adjust_brightness_based_on_text(image):
-		arr = np.array(image)
-		text_pixels = np.sum(arr < 128)
-		total_pixels = arr.size
-		text_ratio = text_pixels / total_pixels
-		brightness_factor = 1.0 - 0.03 * (text_ratio - 0.5)
-		enhancer = ImageEnhance.Brightness(image)
-		image = enhancer.enhance(brightness_factor)
-		return image
-
-	with fitz.open(input_pdf_path) as doc:
+			thickness_draw.line([(x, 0), (x, height)], fill=intensity)
+
+	# Combine all shadows
+	arr = _multiply(arr, np.asarray(shadow))
+	arr = _multiply(arr, np.asarray(thickness_shadow))
+
+	return arr
+
+def add_noise(arr):
+	height, width = arr.shape[:2]
+	# Uniform integer noise in [-8, 8] (sigma ~4.9, like the Gaussian sigma=5 it
+	# replaces) keeps the whole pass in int16
+	noisy = arr.astype(np.int16)
+	noisy += np.random.randint(-8, 9, arr.shape, dtype=np.int16)
+	arr = np.clip(noisy, 0, 255).astype(np.uint8)
+	# White specks, scattered straight into the freshly made array
+	num_specks = int(width * height * 0.0003)
+	xs = np.random.randint(0, width, num_specks)
+	ys = np.random.randint(0, height, num_specks)
+	arr.reshape(-1)[ys * width + xs] = 255
+	return arr
+
+def add_scanlines(arr):
+	# Only add scanlines ~20% of the time
+	if np.random.random() > 0.2:
+		return arr
+		
+	height, width = arr.shape[:2]
+
+	# Create clusters of scanlines
+	num_clusters = int(height * 0.002)  # Fewer clusters
+	cluster_centers = np.random.randint(0, height, num_clusters)
+	num_lines = np.random.randint(1, 21, num_clusters)  # 1-21 lines per cluster
+	line_spacing = 2  # Closer together
+	# Line i of each cluster sits at center + i * spacing
+	line_index = np.arange(num_lines.sum()) - np.repeat(np.cumsum(num_lines) - num_lines, num_lines)
+	ys = np.repeat(cluster_centers, num_lines) + line_index * line_spacing
+	ys = ys[ys < height]
+
+	# Each scanline is a full-width stripe, so only those rows need darkening
+	row_levels = np.full(height, 255, dtype=np.uint8)
+	row_levels[ys] = np.random.randint(220, 250, len(ys))  # Slightly darker lines
+	rows = np.flatnonzero(row_levels < 255)
+	arr = arr.copy()
+	arr[rows] = _multiply(arr[rows], row_levels[rows, None])
+	return arr
+
+def adjust_brightness_based_on_text(arr):
+	text_pixels = np.count_nonzero(arr < 128)
+	total_pixels = arr.size
+	text_ratio = text_pixels / total_pixels
+	brightness_factor = 1.0 - 0.03 * (text_ratio - 0.5)
+	# Scale all 256 levels once and apply them as a lookup table
+	lut = np.clip(np.arange(256) * np.float32(brightness_factor), 0, 255).astype(np.uint8)
+	return lut[arr]
+
+_worker_doc = None
+
+def _init_worker(pdf_source):
+	"""Worker initializer: open a private copy of the source PDF"""
+	global _worker_doc
+	# Reseed so forked processes don't share one noise sequence
+	np.random.seed()
+	if cv2 is not None:
+		# The pool already runs one process per CPU; OpenCV's own thread pool
+		# in every worker would oversubscribe the machine
+		cv2.setNumThreads(1)
+	if isinstance(pdf_source, bytes):
+		_worker_doc = fitz.open(stream=pdf_source, filetype='pdf')
+	else:
+		_worker_doc = fitz.open(pdf_source)
+
+def _process_page(task):
+	"""Worker entry point: render one page and apply the effect, returning JPEG bytes
+	or, when lossless, (mode, width, height, raw samples)"""
+	page_index, color_mode, render_scale, lossless = task
+	# Render straight into the target colorspace and wrap the raw samples,
+	# skipping an encode/decode round trip. The array is read-only.
+	colorspace = fitz.csGRAY if color_mode == 'mono' else fitz.csRGB
+	matrix = fitz.Matrix(render_scale, render_scale)
+	pix = _worker_doc[page_index].get_pixmap(matrix=matrix, colorspace=colorspace)
+	arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+	if pix.n == 1:
+		arr = arr[:, :, 0]
+	modified_img = add_photocopy_effect(arr, page_index + 1, color_mode)
+	if lossless:
+		# Skip encoding; the main process wraps the samples in a Pixmap
+		return modified_img.mode, modified_img.width, modified_img.height, modified_img.tobytes()
+	img_bytes = BytesIO()
+	# The effect already destroys fine detail, so lossy JPEG is indistinguishable
+	# from PNG here while being far smaller and faster to encode. Mono pages stay
+	# single-channel L.
+	if color_mode == 'mono':
+		modified_img.save(img_bytes, format='JPEG', quality=80, subsampling=0, optimize=False)
+	else:
+		modified_img.save(img_bytes, format='JPEG', quality=82)
+	return img_bytes.getvalue()
+
+def apply_photocopy_effect(input_pdf, output_pdf_path, color_mode='mono', max_workers=None, render_scale=1.5, lossless=False):
+	if hasattr(input_pdf, 'read'):
+		pdf_source = input_pdf.read()
+		doc = fitz.open(stream=pdf_source, filetype='pdf')
+	else:
+		pdf_source = input_pdf
+		doc = fitz.open(input_pdf)
+
+	workers = max_workers or os.cpu_count() or 1
+	# Workers render pages from their own copy of the document (MuPDF documents
+	# can't be shared across threads or processes), so rendering overlaps the
+	# effects and this process only inserts the finished images
+	with doc, concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pdf_source,)) as executor:
 		total_pages = len(doc)
-		for page_index in range(total_pages):
-			page_number = page_index + 1
-			print(f"Applying photocopy effect to page {page_number} of {total_pages}")
+		tasks = [(page_index, color_mode, render_scale, lossless) for page_index in range(total_pages)]
+		for page_index, image_data in enumerate(executor.map(_process_page, tasks, chunksize=4)):
+			print(f"Applying photocopy effect to page {page_index + 1} of {total_pages}")
 			page = doc[page_index]
-			pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-			img = Image.open(BytesIO(pix.tobytes()))
-			modified_img = add_photocopy_effect(img, page_number)
-			img_bytes = BytesIO()
-			modified_img.save(img_bytes, format='PNG')
-			page.clean_contents()
 			rect = page.rect
-			page.insert_image(rect, stream=img_bytes.getvalue())
-		doc.save(output_pdf_path)
+			# The raster covers the whole page, so drawing it on top hides the
+			# original content without rewriting its content stream first
+			if lossless:
+				# Page curl leaves even color pages in L, so go by the image mode
+				mode, width, height, samples = image_data
+				colorspace = fitz.csGRAY if mode == 'L' else fitz.csRGB
+				pixmap = fitz.Pixmap(colorspace, width, height, samples, 0)
+				page.insert_image(rect, pixmap=pixmap, overlay=True)
+			else:
+				page.insert_image(rect, stream=image_data, overlay=True)
+		# Raw pixmaps are stored uncompressed unless deflated on save
+		doc.save(output_pdf_path, deflate=lossless)
 
 # end photocopy_effect.py
\ No newline at end of file